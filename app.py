@@ -1,10 +1,39 @@
+import csv
+import io
+
 import streamlit as st
-import numpy as np
-import pandas as pd
-import matplotlib.pyplot as plt
 
 st.set_page_config(page_title="SDG3 — Health & Wellbeing Recommender", layout="centered")
 
+# ---------- Constants ----------
+
+_ACTIVITY = {
+    "sedentary": 1.2,       # little or no exercise
+    "light": 1.375,         # light exercise 1-3 days/week
+    "moderate": 1.55,       # moderate 3-5 days/week
+    "active": 1.725,        # hard exercise 6-7 days/week
+    "very active": 1.9      # very hard exercise / physical job
+}
+
+# Mifflin-St Jeor constant by gender (anything else uses the female formula)
+_BMR_OFFSET = {
+    "male": 5,
+    "female": -161
+}
+
+# protein target (g per kg bodyweight) by goal
+_PROTEIN_PER_KG = {
+    "lose": 1.6,            # higher protein to preserve muscle during deficit
+    "gain": 1.6,
+    "maintain": 1.2
+}
+
+# hydration feedback, indexed by whether intake meets the recommendation
+_WATER_MSG = (
+    "You're drinking less than the general recommendation — try increasing water gradually.",
+    "Your reported water intake meets or exceeds the general guideline."
+)
+
 # ---------- Helper functions ----------
 
 def calc_bmi(weight_kg, height_cm):
@@ -26,21 +55,16 @@ def bmi_category(bmi):
         return "Obesity"
 
 def bmr_mifflin(weight, height, age, gender):
-    # weight in kg, height in cm, age in years
-    if gender.lower() == "male":
-        return 10*weight + 6.25*height - 5*age + 5
-    else:
-        return 10*weight + 6.25*height - 5*age - 161
+    # weight in kg, height in cm, age in years; gender is expected lowercase
+    return 10*weight + 6.25*height - 5*age + _BMR_OFFSET.get(gender, -161)
 
 def activity_multiplier(level):
-    mapping = {
-        "sedentary": 1.2,       # little or no exercise
-        "light": 1.375,         # light exercise 1-3 days/week
-        "moderate": 1.55,       # moderate 3-5 days/week
-        "active": 1.725,        # hard exercise 6-7 days/week
-        "very active": 1.9      # very hard exercise / physical job
-    }
-    return mapping.get(level, 1.2)
+    return _ACTIVITY.get(level, 1.2)
+
+def water_reco(weight_kg):
+    # rough: 30 ml per kg bodyweight, 1 cup = ~250 ml
+    ml = 30 * weight_kg
+    return ml, round(ml / 250)
 
 def calorie_target(tdee, goal):
     if goal == 'lose':
@@ -66,6 +90,113 @@ def macro_split(calories, protein_g_per_kg, weight):
         'carb_g': round(carb_g)
     }
 
+# Sample meal plan generator (simple templates)
+
+def sample_meal_plan(calories):
+    # Simple heuristic: 20% breakfast, 30% lunch, 15% snack, 35% dinner
+    b = int(calories * 0.20)
+    l = int(calories * 0.30)
+    s = int(calories * 0.15)
+    d = int(calories * 0.35)
+    return {
+        'Breakfast': (b, ["Oats or wholegrain cereal (1 bowl)", "1 serving fruit", "6-8 egg whites or 1 whole egg + 2 whites or paneer/tofu"]),
+        'Lunch': (l, ["1 cup cooked whole grains (rice/quinoa)", "Large serving vegetables/salad", "100-150 g lean protein (chicken/fish/legumes)"]),
+        'Snack': (s, ["Greek yogurt or a handful of nuts + fruit"]),
+        'Dinner': (d, ["Vegetable stir-fry or salad with protein", "Smaller portion of carbs than lunch"])
+    }
+
+# Exercise suggestions based on BMI category and exercise level
+
+def exercise_plan(category, level):
+    plans = {}
+    # Base aerobic recommendations
+    if level in ['sedentary','light']:
+        cardio = "Start with 20-30 minutes brisk walking 4-5x/week. Gradually increase intensity to include 2 sessions of 20-30 minutes of jogging or cycling."
+    elif level == 'moderate':
+        cardio = "Maintain 30-45 minutes of moderate cardio 4-5x/week; include 1-2 higher-intensity intervals per week."
+    else:
+        cardio = "Keep varied cardio 4-6x/week, include intervals or sports for intensity and enjoyment."
+
+    # Strength training
+    if category == "Unknown":
+        strength = "General strength training 2-3x/week focusing on all major muscle groups."
+    elif category == "Underweight":
+        strength = "Focus on progressive resistance training 3x/week to build muscle mass; use compound lifts and ensure calorie surplus if trying to gain."
+    elif category == "Normal weight":
+        strength = "Balanced strength training 2-4x/week to preserve muscle and support metabolism; combine full-body sessions."
+    else:
+        strength = "Begin with low-impact strength and mobility work 2-3x/week, gradually increase intensity; combine with aerobic work for fat loss."
+
+    mobility = "Include mobility and flexibility work (10-15 min) after workouts or on rest days — yoga or dynamic stretching." 
+
+    return {
+        'cardio': cardio,
+        'strength': strength,
+        'mobility': mobility
+    }
+
+def bmi_gauge_svg(bmi):
+    # Inline SVG gauge: coloured BMI bands from 10 to 40 with a marker at the user's BMI
+    width, height = 600, 60
+
+    def scale(v):
+        return (min(max(v, 10), 40) - 10) / 30 * width
+
+    ranges = [(10,18.5,'Under'), (18.5,25,'Normal'), (25,30,'Over'), (30,40,'Obese')]
+    colors = ['#ffd1dc','#c8f7c5','#fff2b2','#ffb3b3']
+    parts = [f'<svg width="100%" height="{height}" viewBox="0 0 {width} {height}" preserveAspectRatio="none" xmlns="http://www.w3.org/2000/svg">']
+    for (start,end,_),c in zip(ranges,colors):
+        parts.append(f'<rect x="{scale(start):.1f}" y="0" width="{scale(end) - scale(start):.1f}" height="{height}" fill="{c}"/>')
+    if bmi is not None:
+        x = scale(bmi)
+        parts.append(f'<line x1="{x:.1f}" y1="0" x2="{x:.1f}" y2="{height}" stroke="black" stroke-width="2"/>')
+    parts.append('</svg>')
+    return ''.join(parts)
+
+@st.cache_data(show_spinner=False, max_entries=128)
+def compute_all(weight, height, age, gender, exercise_level, water_cups, goal):
+    # Everything downstream of the form, including the CSV export, in one cached call
+    bmi = calc_bmi(weight, height)
+    bmr = bmr_mifflin(weight, height, age, gender)
+    mult = activity_multiplier(exercise_level)
+    tdee = bmr * mult
+    cal_target = calorie_target(tdee, goal)
+    # protein recommendation based on goal
+    protein_g_per_kg = _PROTEIN_PER_KG.get(goal, 1.2)
+    category = bmi_category(bmi)
+    macros = macro_split(cal_target, protein_g_per_kg, weight)
+    water_ml, water_cups_reco = water_reco(weight)
+    plan = sample_meal_plan(round(cal_target))
+    # Render the meal plan as one Markdown block instead of a widget per line
+    plan_md = "\n\n".join(
+        f"*{meal} — ~{cals} kcal*\n" + "\n".join(f"- {it}" for it in items)
+        for meal, (cals, items) in plan.items()
+    )
+
+    summary = {
+        'metric': ['BMI','BMI_category','BMR_kcal','TDEE_kcal','Calorie_target_kcal','Protein_g','Fat_g','Carb_g','Water_cups_reported','Water_cups_recommended','Exercise_level'],
+        'value': [round(bmi,1) if bmi else '', category, round(bmr), round(tdee), round(cal_target), macros['protein_g'], macros['fat_g'], macros['carb_g'], water_cups, water_cups_reco, exercise_level]
+    }
+    buf = io.StringIO()
+    w = csv.writer(buf)
+    w.writerow(['metric','value'])
+    w.writerows(zip(summary['metric'], summary['value']))
+
+    return {
+        'bmi': bmi,
+        'category': category,
+        'bmr': bmr,
+        'mult': mult,
+        'tdee': tdee,
+        'cal_target': cal_target,
+        'macros': macros,
+        'water': (water_ml, water_cups_reco),
+        'plan_md': plan_md,
+        'ex_plan': exercise_plan(category, exercise_level),
+        'svg': bmi_gauge_svg(bmi),
+        'csv_bytes': buf.getvalue().encode()
+    }
+
 # ---------- UI ----------
 
 st.title("SDG 3 — Good Health & Wellbeing: Diet & Exercise Recommender")
@@ -82,7 +213,7 @@ with st.form("inputs"):
         water_cups = st.number_input("Water intake (cups per day, 1 cup = ~250 ml)", min_value=0, max_value=20, value=6)
     with col2:
         height = st.number_input("Height (cm)", min_value=80.0, max_value=250.0, value=170.0, step=0.1)
-        gender = st.selectbox("Gender", options=["male", "female", "other"], index=0)
+        gender = st.selectbox("Gender", options=["male", "female", "other"], index=0).lower()
         exercise_level = st.selectbox(
             "Exercise level",
             options=["sedentary", "light", "moderate", "active", "very active"],
@@ -100,24 +231,16 @@ if not submitted:
 
 # ---------- Calculations ----------
 
-bmi = calc_bmi(weight, height)
-bmi_text = f"{bmi:.1f}" if bmi is not None else "—"
-category = bmi_category(bmi)
-
-bmr = bmr_mifflin(weight, height, age, gender if gender in ['male','female'] else 'female')
-mult = activity_multiplier(exercise_level)
-tdee = bmr * mult
-cal_target = calorie_target(tdee, goal)
+result = compute_all(weight, height, age, gender, exercise_level, water_cups, goal)
 
-# protein recommendation based on goal
-if goal == 'lose':
-    protein_g_per_kg = 1.6  # higher protein to preserve muscle during deficit
-elif goal == 'gain':
-    protein_g_per_kg = 1.6
-else:
-    protein_g_per_kg = 1.2
-
-macros = macro_split(cal_target, protein_g_per_kg, weight)
+bmi = result['bmi']
+bmi_text = f"{bmi:.1f}" if bmi is not None else "—"
+category = result['category']
+mult = result['mult']
+bmr_i, tdee_i, cal_i = round(result['bmr']), round(result['tdee']), round(result['cal_target'])
+macros = result['macros']
+recommended_water_ml, recommended_cups = result['water']
+ex_plan = result['ex_plan']
 
 # ---------- Output ----------
 
@@ -125,103 +248,46 @@ st.subheader("Body metrics & energy needs")
 col1, col2 = st.columns(2)
 with col1:
     st.metric("BMI", bmi_text)
-    st.write(f"Category: *{category}*")
-    st.write(f"BMR (Mifflin-St Jeor): *{round(bmr)} kcal/day*")
+    st.markdown(
+        f"Category: *{category}*  \n"
+        f"BMR (Mifflin-St Jeor): *{bmr_i} kcal/day*"
+    )
 with col2:
-    st.write(f"Activity multiplier: *{mult}* ({exercise_level})")
-    st.write(f"Estimated TDEE: *{round(tdee)} kcal/day*")
-    st.write(f"Recommended daily calories ({goal}): *{round(cal_target)} kcal/day*")
+    st.markdown(
+        f"Activity multiplier: *{mult}* ({exercise_level})  \n"
+        f"Estimated TDEE: *{tdee_i} kcal/day*  \n"
+        f"Recommended daily calories ({goal}): *{cal_i} kcal/day*"
+    )
 
 # BMI gauge visualization
-fig, ax = plt.subplots(figsize=(6,1.2))
-ax.set_xlim(10,40)
-ax.set_ylim(0,1)
-ax.axis('off')
-# rectangles for BMI ranges
-ranges = [(10,18.5,'Under'), (18.5,25,'Normal'), (25,30,'Over'), (30,40,'Obese')]
-colors = ['#ffd1dc','#c8f7c5','#fff2b2','#ffb3b3']
-for (start,end,_),c in zip(ranges,colors):
-    ax.fill_betweenx([0,1],[start],[end], color=c)
-ax.plot([bmi,bmi],[0,1], color='black')
-ax.text(10,0.5,'',)
-st.pyplot(fig)
+st.markdown(result['svg'], unsafe_allow_html=True)
 
 st.subheader("Hydration check")
-recommended_water_ml = 30 * weight  # rough: 30 ml per kg bodyweight
-recommended_cups = round(recommended_water_ml / 250)
-st.write(f"You reported *{water_cups} cups ({water_cups*250} ml)* per day.")
-st.write(f"General recommendation: *~{recommended_cups} cups ({recommended_water_ml:.0f} ml)* per day (approx. 30 ml/kg).")
-if water_cups < recommended_cups:
-    st.warning("You're drinking less than the general recommendation — try increasing water gradually.")
-else:
-    st.success("Your reported water intake meets or exceeds the general guideline.")
+st.markdown(
+    f"You reported *{water_cups} cups ({water_cups*250} ml)* per day.  \n"
+    f"General recommendation: *~{recommended_cups} cups ({recommended_water_ml:.0f} ml)* per day (approx. 30 ml/kg)."
+)
+water_ok = water_cups >= recommended_cups
+(st.success if water_ok else st.warning)(_WATER_MSG[water_ok])
 
 st.subheader("Personalized diet recommendation")
-st.write(f"Daily calorie target: *{round(cal_target)} kcal*")
-st.write(f"Macronutrient targets (approx.): Protein *{macros['protein_g']} g, Fat *{macros['fat_g']} g*, Carbs *{macros['carb_g']} g**")
+st.markdown(
+    f"Daily calorie target: *{cal_i} kcal*  \n"
+    f"Macronutrient targets (approx.): Protein *{macros['protein_g']} g*, Fat *{macros['fat_g']} g*, Carbs *{macros['carb_g']} g*"
+)
 
 st.markdown("*Nutrition guidance & sample meals*")
-
-# Sample meal plan generator (simple templates)
-
-def sample_meal_plan(calories):
-    # Simple heuristic: 20% breakfast, 30% lunch, 15% snack, 35% dinner
-    b = int(calories * 0.20)
-    l = int(calories * 0.30)
-    s = int(calories * 0.15)
-    d = int(calories * 0.35)
-    return {
-        'Breakfast': (b, ["Oats or wholegrain cereal (1 bowl)", "1 serving fruit", "6-8 egg whites or 1 whole egg + 2 whites or paneer/tofu"]),
-        'Lunch': (l, ["1 cup cooked whole grains (rice/quinoa)", "Large serving vegetables/salad", "100-150 g lean protein (chicken/fish/legumes)"]),
-        'Snack': (s, ["Greek yogurt or a handful of nuts + fruit"]),
-        'Dinner': (d, ["Vegetable stir-fry or salad with protein", "Smaller portion of carbs than lunch"])
-    }
-
-plan = sample_meal_plan(round(cal_target))
-for meal, (cals, items) in plan.items():
-    st.write(f"*{meal} — ~{cals} kcal*")
-    for it in items:
-        st.write("- ", it)
+st.markdown(result['plan_md'])
 
 st.markdown("*Practical nutrition tips*")
 st.write("- Prefer whole foods over ultra-processed foods.\n- Prioritise lean protein, whole grains, legumes, vegetables, and healthy fats.\n- Watch portion sizes and use a food scale/app if precise tracking is needed.\n- If trying to lose weight, aim for a modest calorie deficit and maintain protein intake to preserve muscle.")
 
 st.subheader("Personalized exercise recommendation")
-
-# Exercise suggestions based on BMI and exercise level
-
-def exercise_plan(bmi, level):
-    plans = {}
-    # Base aerobic recommendations
-    if level in ['sedentary','light']:
-        cardio = "Start with 20-30 minutes brisk walking 4-5x/week. Gradually increase intensity to include 2 sessions of 20-30 minutes of jogging or cycling."
-    elif level == 'moderate':
-        cardio = "Maintain 30-45 minutes of moderate cardio 4-5x/week; include 1-2 higher-intensity intervals per week."
-    else:
-        cardio = "Keep varied cardio 4-6x/week, include intervals or sports for intensity and enjoyment."
-
-    # Strength training
-    if bmi is None:
-        strength = "General strength training 2-3x/week focusing on all major muscle groups."
-    elif bmi < 18.5:
-        strength = "Focus on progressive resistance training 3x/week to build muscle mass; use compound lifts and ensure calorie surplus if trying to gain."
-    elif bmi < 25:
-        strength = "Balanced strength training 2-4x/week to preserve muscle and support metabolism; combine full-body sessions."
-    else:
-        strength = "Begin with low-impact strength and mobility work 2-3x/week, gradually increase intensity; combine with aerobic work for fat loss."
-
-    mobility = "Include mobility and flexibility work (10-15 min) after workouts or on rest days — yoga or dynamic stretching." 
-
-    return {
-        'cardio': cardio,
-        'strength': strength,
-        'mobility': mobility
-    }
-
-ex_plan = exercise_plan(bmi, exercise_level)
-st.write("*Cardio:*", ex_plan['cardio'])
-st.write("*Strength training:*", ex_plan['strength'])
-st.write("*Mobility & recovery:*", ex_plan['mobility'])
+st.markdown(
+    f"*Cardio:* {ex_plan['cardio']}  \n"
+    f"*Strength training:* {ex_plan['strength']}  \n"
+    f"*Mobility & recovery:* {ex_plan['mobility']}"
+)
 
 st.markdown("*Safety & notes*")
 st.write("- Consult a doctor before starting any new intense program, especially if you have existing medical conditions.\n- Start slow and progress gradually.\n- Sleep, stress management and consistent hydration are essential for health and fitness goals.\n- This tool provides general guidance — for a detailed clinical or therapeutic plan, consult a registered dietitian or certified trainer.")
@@ -230,7 +296,6 @@ st.markdown("---")
 st.caption("This app is aligned with Sustainable Development Goal 3 (Good Health and Wellbeing): promoting healthy lives and well-being for all ages.")
 
 # Offer download of summary as CSV
-summary = {
-    'metric': ['BMI','BMI_category','BMR_kcal','TDEE_kcal','Calorie_target_kcal','Protein_g','Fat_g','Carb_g','Water_cups_reported','Water_cups_recommended','Exercise_level'],
-    'value': [round(bmi,1) if bmi else '', category, round(bmr), round(tdee), round(cal_target), macros['protein_g'], macros['fat_g'], macros['carb_g'], water_cups, recommended_cups, exercise_level]
-}
\ No newline at end of file
+# on_click="ignore" keeps the click from rerunning the script, which would hit the
+# not-submitted guard above and clear the results
+st.download_button("Download summary (CSV)", data=result['csv_bytes'], file_name="health_summary.csv", mime="text/csv", on_click="ignore")
\ No newline at end of file